@@ -1,18 +1,24 @@
 import os
 import time
 import hashlib
+import xxhash
 import requests
 import json
+import orjson
 import random
 import csv
-from bs4 import BeautifulSoup
+import shutil
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+import soupsieve as sv
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import etree, html as lh
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from urllib.parse import urljoin, urlencode
-from datetime import datetime
 from utils.logging import setup_logger
 
 # ========================= CONFIG (loaded from config/scrape_config.json) =========================
@@ -82,7 +88,7 @@ os.makedirs(TEXT_DIR, exist_ok=True)
 # initialize logger now that BASE_DIR is known
 logger = setup_logger(name='amazon_scraper', base_dir=BASE_DIR, config_path=os.path.join('config','logging_config.json'), caller_file=__file__)
 # Record script start time for total run duration logging
-SCRIPT_START = datetime.now()
+SCRIPT_START = time.perf_counter_ns()
 
 # Scrape runtime settings
 HEADLESS = bool(_CFG['HEADLESS'])
@@ -91,6 +97,36 @@ DELAY_RANGE = tuple(_CFG['DELAY_RANGE'])
 CATEGORIES = _CFG['CATEGORIES']
 BASE_SEARCH_URL = _CFG['BASE_SEARCH_URL']
 
+# HTML parser used for every BeautifulSoup call (C-based, much faster than html.parser)
+PARSER = "lxml"
+# Only build the parts of the product DOM the extractors actually read
+PRODUCT_STRAINER = SoupStrainer(attrs={"id": "dp-container"})
+# hrefs of a.a-link-normal.s-no-outline on a search results page (evaluated directly with lxml)
+LISTING_HREFS = etree.XPath(
+    "//a[contains(concat(' ', normalize-space(@class), ' '), ' a-link-normal ')"
+    " and contains(concat(' ', normalize-space(@class), ' '), ' s-no-outline ')]/@href",
+    smart_strings=False,  # plain str results, so the results tree can be freed right away
+)
+# CSS selectors still used per row, compiled once instead of on every call
+SEL_DETAIL_LABEL = sv.compile(".a-col-left span.a-color-base")
+SEL_DETAIL_VALUE = sv.compile(".a-col-right span.a-color-base")
+
+# Shared HTTP session for image downloads (keep-alive + connection pooling to the image CDN)
+_IMG_SESSION = requests.Session()
+_IMG_SESSION.headers.update({"User-Agent": "Mozilla/5.0"})
+_IMG_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+))
+# Background workers so image downloads overlap with Selenium page loads
+_IMG_POOL = ThreadPoolExecutor(max_workers=8)
+MAX_PENDING_IMAGES = 32
+# Bronze CSV schema; variable product details are stored as one JSON column
+CSV_FIELDS = ("id", "url", "title", "price", "rating", "brand", "color", "product_details")
+# Flush the open CSV / ids files every N saved products
+CSV_FLUSH_EVERY = 10
+
 # ========================= DRIVER & HELPERS =========================
 def get_driver():
     options = Options()
@@ -101,11 +137,18 @@ def get_driver():
     options.add_argument("--disable-blink-features=AutomationControlled")
     options.add_argument("--window-size=1920,1080")
     options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
+    # Don't load images: we only parse HTML, and the hero image URL comes from its attributes
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
     driver = webdriver.Chrome(options=options)
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined});")
     return driver
 
 def generate_id(url):
+    return xxhash.xxh64(url.encode()).hexdigest()
+
+def legacy_id(url):
+    """md5 id written by earlier runs; only checked when such ids were loaded."""
     return hashlib.md5(url.encode()).hexdigest()
 
 def random_delay():
@@ -115,60 +158,110 @@ def scroll_randomly(driver):
     driver.execute_script("window.scrollTo(0, document.body.scrollHeight * Math.random());")
     time.sleep(0.8)
 
+# ---- In-browser helpers: shared JS function bodies that the scripts below concatenate ----
+# findContinueButton([[xpath, kind], ...]) -> [button, kind] for the first visible match, or null
+FIND_CONTINUE_FN = """
+function findContinueButton(xpaths) {
+    for (const [xp, kind] of xpaths) {
+        const res = document.evaluate(xp, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (let i = 0; i < res.snapshotLength; i++) {
+            const el = res.snapshotItem(i);
+            if (el.getClientRects().length && getComputedStyle(el).visibility !== 'hidden') return [el, kind];
+        }
+    }
+    return null;
+}
+"""
+# isSorry(markers) -> true if the page HTML (lower-cased) contains any marker
+IS_SORRY_FN = """
+function isSorry(markers) {
+    const html = document.documentElement.outerHTML.toLowerCase();
+    return markers.some(m => html.includes(m));
+}
+"""
+# waitFor(selector, timeoutMs, done) -> done(true) as soon as selector matches (MutationObserver), done(false) on timeout
+WAIT_FOR_FN = """
+function waitFor(selector, timeoutMs, done) {
+    if (document.querySelector(selector)) return done(true);
+    const timer = setTimeout(() => { obs.disconnect(); done(false); }, timeoutMs);
+    const obs = new MutationObserver(() => {
+        if (document.querySelector(selector)) { obs.disconnect(); clearTimeout(timer); done(true); }
+    });
+    obs.observe(document.documentElement, {childList: true, subtree: true});
+}
+"""
+
+WAIT_FOR_SELECTOR_JS = WAIT_FOR_FN + """
+const [selector, timeoutMs, done] = arguments;
+waitFor(selector, timeoutMs, done);
+"""
+
+def wait_for_selector(driver, selector, timeout=12):
+    """Wait in the browser until selector is present; one round-trip instead of WebDriverWait polling."""
+    try:
+        return bool(driver.execute_async_script(WAIT_FOR_SELECTOR_JS, selector, int(timeout * 1000)))
+    except Exception:
+        return False
+
+# Exact XPath provided by user (full path)
+CONTINUE_EXACT_XPATH = "/html/body/div/div[1]/div[3]/div/div/form/div/div/span/span/button"
+# Tolerant XPath: button with class a-button-text or alt/text containing 'Continue shopping'
+CONTINUE_TOLERANT_XPATH = "//button[contains(@class,'a-button-text') and (contains(translate(normalize-space(.),'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'continue shopping') or contains(translate(@alt,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'continue shopping'))]"
+FIND_CONTINUE_JS = FIND_CONTINUE_FN + """
+return findContinueButton([[arguments[0], 'exact'], [arguments[1], 'tolerant']]);
+"""
+
+def click_continue_button(driver, btn, kind):
+    """Click a Continue shopping button found by findContinueButton (JS click as fallback)."""
+    logger.info(f'Detected Continue shopping button ({kind}). Clicking it...')
+    try:
+        btn.click()
+    except Exception:
+        driver.execute_script('arguments[0].click();', btn)
+    time.sleep(0.6 + random.random() * 0.4)
+    logger.info(f'Clicked Continue shopping ({kind})')
+
 def click_continue_shopping_if_present(driver):
     """If a 'Continue shopping' button appears, click it and return True. Otherwise return False.
 
-    Looks for the exact button the user reported and a few tolerant XPaths. Logs actions.
+    Looks for the exact button the user reported and a tolerant XPath in a single
+    in-browser probe, so the common no-button case costs one round-trip. Logs actions.
     """
     try:
-        # Exact XPath provided by user (full path)
-        exact_xpath = "/html/body/div/div[1]/div[3]/div/div/form/div/div/span/span/button"
-        try:
-            btns = driver.find_elements(By.XPATH, exact_xpath)
-            for b in btns:
-                if b.is_displayed():
-                    logger.info('Detected exact Continue shopping button (XPath). Clicking it...')
-                    try:
-                        b.click()
-                    except Exception:
-                        driver.execute_script('arguments[0].click();', b)
-                    time.sleep(0.6 + random.random() * 0.4)
-                    logger.info('Clicked Continue shopping (exact)')
-                    return True
-        except Exception:
-            pass
-
-        # Tolerant XPath: button with class a-button-text or alt/text containing 'Continue shopping'
-        tolerant_xp = "//button[contains(@class,'a-button-text') and (contains(translate(normalize-space(.),'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'continue shopping') or contains(translate(@alt,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'continue shopping'))]"
-        try:
-            els = driver.find_elements(By.XPATH, tolerant_xp)
-            for e in els:
-                if e.is_displayed():
-                    logger.info('Detected Continue shopping button (tolerant). Clicking it...')
-                    try:
-                        e.click()
-                    except Exception:
-                        driver.execute_script('arguments[0].click();', e)
-                    time.sleep(0.6 + random.random() * 0.4)
-                    logger.info('Clicked Continue shopping (tolerant)')
-                    return True
-        except Exception:
-            pass
-
+        found = driver.execute_script(FIND_CONTINUE_JS, CONTINUE_EXACT_XPATH, CONTINUE_TOLERANT_XPATH)
+        if not found:
+            return False
+        click_continue_button(driver, *found)
+        return True
     except Exception:
         pass
     return False
 
 
+# Lower-case substrings that identify Amazon's error/sorry (dog) page
+SORRY_MARKERS = ('error/500_503.png', 'sorry! something went wrong', 'we\'re sorry')
+# Runs the substring checks in the browser so only a boolean crosses the wire
+SORRY_PAGE_JS = IS_SORRY_FN + """
+return isSorry(arguments[0]);
+"""
+
+def is_sorry_page(driver, markers):
+    """Return True if the current page contains any of markers (case-insensitive)."""
+    try:
+        return bool(driver.execute_script(SORRY_PAGE_JS, list(markers)))
+    except Exception:
+        src = (driver.page_source or '').lower()
+        return any(m in src for m in markers)
+
+
 def handle_sorry_page(driver, product_url=None, max_retries=3):
     """Detect Amazon error/sorry page (dog image) and try to recover.
 
     Returns True if page appears OK after recovery, False if still bad.
     """
     for attempt in range(1, max_retries + 1):
-        src = (driver.page_source or '').lower()
         # Detect the well-known dog/error image or textual indicators
-        if 'error/500_503.png' not in src and 'sorry! something went wrong' not in src and 'we\'re sorry' not in src:
+        if not is_sorry_page(driver, SORRY_MARKERS):
             return True
 
         logger.warning(f"Detected Amazon error page (attempt {attempt}/{max_retries}). Trying recovery...")
@@ -213,22 +306,85 @@ def handle_sorry_page(driver, product_url=None, max_retries=3):
                 pass
 
     # If we exit the loop, final check
-    final_src = (driver.page_source or '').lower()
-    if 'error/500_503.png' in final_src or 'sorry! something went wrong' in final_src:
+    if is_sorry_page(driver, SORRY_MARKERS[:2]):
         logger.error('Recovery failed — still seeing Amazon error page')
         return False
     logger.info('Recovery succeeded — page appears normal')
     return True
 
+# Fused product-page check built from the shared helpers; resolves [status, button] where status is
+#   'button'  - a visible Continue shopping button (returned so Python clicks it the usual way)
+#   'sorry'   - the error/sorry page is showing
+#   'ok'      - the selector is present (waits for it with a MutationObserver)
+#   'timeout' - the selector did not appear within timeoutMs
+PRODUCT_PAGE_STATUS_JS = FIND_CONTINUE_FN + IS_SORRY_FN + WAIT_FOR_FN + """
+const [exactXp, tolerantXp, markers, selector, timeoutMs, done] = arguments;
+const found = findContinueButton([[exactXp, 'exact'], [tolerantXp, 'tolerant']]);
+if (found) return done(['button', found]);
+if (isSorry(markers)) return done(['sorry', null]);
+waitFor(selector, timeoutMs, ok => done([ok ? 'ok' : 'timeout', null]));
+"""
+
+def probe_product_page(driver, timeout=12):
+    """Run the Continue shopping / sorry page / #productTitle checks in one round-trip.
+
+    A Continue shopping button is clicked through click_continue_button. Returns
+    'ok', 'sorry', 'timeout', 'clicked', or 'error' if the probe itself failed.
+    """
+    try:
+        status, found = driver.execute_async_script(
+            PRODUCT_PAGE_STATUS_JS, CONTINUE_EXACT_XPATH, CONTINUE_TOLERANT_XPATH,
+            list(SORRY_MARKERS), "#productTitle", int(timeout * 1000))
+        if status == 'button':
+            click_continue_button(driver, *found)
+            return 'clicked'
+        return status
+    except Exception:
+        return 'error'
+
 # ========================= EXTRACTION FUNCTIONS (Modular) =========================
-def extract_title(soup): return soup.select_one("#productTitle").get_text(strip=True) if soup.select_one("#productTitle") else "N/A"
+# ids / classes the extractors read; collected in a single tree walk by extract_all
+NODE_IDS = {"productTitle", "bylineInfo", "inline-twister-expanded-dimension-text-color_name",
+            "feature-bullets", "landingImage", "imgTag"}
+NODE_CLASSES = {"a-price-whole", "a-price-fraction", "a-price-symbol", "a-icon-alt",
+                "selection", "product-facts-detail"}
+
 
+def extract_all(soup):
+    """Walk the parsed page once and index the nodes the extractors need.
+
+    Returns a dict keyed "#<id>" -> first tag with that id, ".<class>" -> list of
+    tags with that class (document order) and "about_h3" -> list of
+    "About this item" headings. Every extract_* function reads from this dict.
+    """
+    nodes = {}
+    for el in soup.find_all(True):
+        el_id = el.get("id")
+        if el_id in NODE_IDS:
+            nodes.setdefault(f"#{el_id}", el)
+        for cls in el.get("class", ()):
+            if cls in NODE_CLASSES:
+                nodes.setdefault(f".{cls}", []).append(el)
+        if el.name == "h3" and "About this item" in el.get_text():
+            nodes.setdefault("about_h3", []).append(el)
+    return nodes
+
+def _first(nodes, key, tag=None):
+    found = nodes.get(key)
+    if found is None or not isinstance(found, list):
+        return found
+    return next((el for el in found if tag is None or el.name == tag), None)
+
+def extract_title(nodes):
+    el = _first(nodes, "#productTitle")
+    return el.get_text(strip=True) if el else "N/A"
 
-def extract_price(soup):
+
+def extract_price(nodes):
     try:
-        whole = soup.select_one(".a-price-whole")
-        fraction = soup.select_one(".a-price-fraction")
-        symbol = soup.select_one(".a-price-symbol")
+        whole = _first(nodes, ".a-price-whole")
+        fraction = _first(nodes, ".a-price-fraction")
+        symbol = _first(nodes, ".a-price-symbol")
 
         if not whole or not symbol:
             return None
@@ -245,54 +401,68 @@ def extract_price(soup):
     except:
         return None
 
-def extract_rating(soup):
-    el = soup.select_one('span.a-icon-alt')
+def extract_rating(nodes):
+    el = _first(nodes, ".a-icon-alt", "span")
     return el.get_text(strip=True).split()[0] if el else "N/A"
 
-def extract_brand(soup):
-    el = soup.select_one('#bylineInfo, a#bylineInfo')
+def extract_brand(nodes):
+    el = _first(nodes, "#bylineInfo")
     return el.get_text(strip=True).replace("Visit the", "").replace("Store", "").replace("Brand:", "").strip() if el else "N/A"
 
-def extract_color(soup):
-    el = soup.select_one('span.selection, #inline-twister-expanded-dimension-text-color_name')
+def extract_color(nodes):
+    el = _first(nodes, ".selection", "span") or _first(nodes, "#inline-twister-expanded-dimension-text-color_name")
     return el.get_text(strip=True) if el else "N/A"
 
-def extract_product_details(soup):
+def extract_product_details(nodes):
     details = {}
-    for row in soup.select('.product-facts-detail'):
-        label = row.select_one('.a-col-left span.a-color-base')
-        value = row.select_one('.a-col-right span.a-color-base')
+    for row in nodes.get(".product-facts-detail", ()):
+        label = SEL_DETAIL_LABEL.select_one(row)
+        value = SEL_DETAIL_VALUE.select_one(row)
         if label and value:
             key = label.get_text(strip=True).rstrip(":").lower().replace(" ", "_").replace("-", "_")
             details[key] = value.get_text(strip=True)
     return details
 
-def extract_about_text(soup):
-    ul = soup.select_one('h3:-soup-contains("About this item") ~ ul') or \
-         soup.select_one('#feature-bullets ul')
+def extract_about_text(nodes):
+    ul = next((u for u in (h.find_next_sibling('ul') for h in nodes.get("about_h3", ())) if u), None)
+    if not ul and "#feature-bullets" in nodes:
+        ul = nodes["#feature-bullets"].find('ul')
     if not ul: return ""
     return "\n".join(b.get_text(strip=True) for b in ul.find_all('span', class_='a-list-item') if b.get_text(strip=True))
 
-def extract_image_url(soup):
-    img = soup.select_one('#landingImage, #imgTag')
+def extract_image_url(nodes):
+    img = _first(nodes, "#landingImage") or _first(nodes, "#imgTag")
     if not img: return None
     url = img.get('data-old-hires') or img.get('src')
     if not url and img.get('data-a-dynamic-image'):
-        try: url = list(json.loads(img['data-a-dynamic-image']).keys())[0]
+        try: url = next(iter(orjson.loads(img['data-a-dynamic-image'])))
         except: pass
     return url
 
 def download_image(url, path):
     if not url: return False
     try:
-        r = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=12)
-        if r.status_code == 200:
-            with open(path, "wb") as f:
-                f.write(r.content)
-            return True
-    except: pass
+        # Stream straight to disk with a 64KB buffer instead of holding the whole image in memory
+        with _IMG_SESSION.get(url, stream=True, timeout=12) as r:
+            if r.status_code == 200:
+                r.raw.decode_content = True
+                with open(path, "wb") as f:
+                    shutil.copyfileobj(r.raw, f, length=65536)
+                return True
+    except:
+        # don't leave a truncated image behind
+        if os.path.exists(path):
+            try: os.remove(path)
+            except OSError: pass
     return False
 
+def save_image(pid, url):
+    """Download the product image for pid (runs on the image pool)."""
+    ok = download_image(url, os.path.join(IMAGES_DIR, f"{pid}.jpg"))
+    if not ok:
+        logger.warning(f"Failed to download image for {pid}: {url}")
+    return ok
+
 def expand_details(driver):
     try:
         btn = driver.find_element(By.XPATH, "//a[contains(@class,'a-expander-header')]//h3[contains(text(),'Product details')]//parent::a")
@@ -301,11 +471,40 @@ def expand_details(driver):
             time.sleep(1.5)
     except: pass
 
+def load_scraped_ids(csv_file, ids_file):
+    """Return the set of product ids already saved for a category.
+
+    The CSV is the record of what was saved; the one-id-per-line sidecar is only
+    trusted when it is at least as new as the CSV. Otherwise (older runs, or the two
+    files disagreeing after a hard kill) the ids are read from the CSV and the
+    sidecar is rewritten. A sidecar without its CSV is removed.
+    """
+    if not os.path.exists(csv_file):
+        # e.g. CSV deleted to re-scrape: leftover ids must not skip those products
+        if os.path.exists(ids_file):
+            os.remove(ids_file)
+        return set()
+    if os.path.exists(ids_file) and os.path.getmtime(ids_file) >= os.path.getmtime(csv_file):
+        with open(ids_file, encoding="utf-8") as f:
+            return set(f.read().split())
+    with open(csv_file, encoding="utf-8") as f:
+        scraped_ids = {row["id"] for row in csv.DictReader(f)}
+    with open(ids_file, "w", encoding="utf-8") as f:
+        f.writelines(pid + "\n" for pid in scraped_ids)
+    return scraped_ids
+
+def read_csv_header(csv_file):
+    """Return the header row of an existing CSV, or None if it is missing/empty."""
+    if not os.path.exists(csv_file):
+        return None
+    with open(csv_file, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), None)
+
 # ========================= MAIN SCRAPER =========================
 def scrape_category(driver, category_name, node_id):
     search_url = f"{BASE_SEARCH_URL}{node_id}"
     logger.info(f"Starting → {category_name.upper()} | {search_url}")
-    cat_start = datetime.now()
+    cat_start = time.perf_counter_ns()
     driver.get(search_url)
     time.sleep(3 + random.random()*1.5)
     # If a 'Continue shopping' popup appears on the search page, click it
@@ -316,114 +515,131 @@ def scrape_category(driver, category_name, node_id):
         logger.warning('Search page recovery failed; continuing but results may be incomplete')
 
     csv_file = os.path.join(BASE_DIR, f"{category_name}_bronze.csv")
-    scraped_ids = set()
-    if os.path.exists(csv_file):
-        with open(csv_file, encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            scraped_ids = {row["id"] for row in reader}
+    ids_file = os.path.join(BASE_DIR, f"{category_name}_bronze.ids")
+    scraped_ids = load_scraped_ids(csv_file, ids_file)
+    has_legacy_ids = any(len(i) == 32 for i in scraped_ids)
 
     total_scraped = 0
     page = 1
+    pending_images = deque()
+
+    header = read_csv_header(csv_file)
+    columns = tuple(header) if header else CSV_FIELDS
+    with open(csv_file, "a", newline="", encoding="utf-8") as csv_f, \
+         open(ids_file, "a", encoding="utf-8") as ids_f:
+        writer = csv.writer(csv_f)
+        if not header:
+            writer.writerow(CSV_FIELDS)
+        while total_scraped < MAX_PER_CATEGORY:
+            logger.info(f"Page {page} | Already scraped: {total_scraped}/{MAX_PER_CATEGORY}")
+            scroll_randomly(driver)
+            time.sleep(1.5)
 
-    while total_scraped < MAX_PER_CATEGORY:
-        logger.info(f"Page {page} | Already scraped: {total_scraped}/{MAX_PER_CATEGORY}")
-        scroll_randomly(driver)
-        time.sleep(1.5)
-
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        items = soup.select("a.a-link-normal.s-no-outline")
-
-        if not items:
-            logger.info("No items found → end of results")
-            break
+            hrefs = LISTING_HREFS(lh.fromstring(driver.page_source))
 
-        for item in items:
-            if total_scraped >= MAX_PER_CATEGORY:
+            if not hrefs:
+                logger.info("No items found → end of results")
                 break
-            href = item.get("href")
-            if not href or "/dp/" not in href:
-                continue
-            product_url = urljoin("https://www.amazon.com", href.split("/ref")[0])
-            pid = generate_id(product_url)
-            if pid in scraped_ids:
-                continue
-
-            logger.info(f"→ [{total_scraped+1}] {product_url}")
-            driver.get(product_url)
-            # Gentle wait and attempt to dismiss any 'Continue shopping' before checking page content
-            time.sleep(1.0 + random.random()*1.5)
-            if click_continue_shopping_if_present(driver):
-                logger.info('Continue shopping popup dismissed on product page')
-
-            # If a sorry/error page appears (dog image), attempt recovery before scraping
-            if not handle_sorry_page(driver, product_url=product_url, max_retries=3):
-                logger.warning('Product page recovery failed — skipping this product')
+
+            for href in hrefs:
+                if total_scraped >= MAX_PER_CATEGORY:
+                    break
+                if not href or "/dp/" not in href:
+                    continue
+                product_url = urljoin("https://www.amazon.com", href.split("/ref")[0])
+                pid = generate_id(product_url)
+                if pid in scraped_ids or (has_legacy_ids and legacy_id(product_url) in scraped_ids):
+                    continue
+
+                logger.info(f"→ [{total_scraped+1}] {product_url}")
+                driver.get(product_url)
+                # Gentle wait, then dismiss 'Continue shopping' / detect the sorry page / wait for the title in one call
+                time.sleep(1.0 + random.random()*1.5)
+                status = probe_product_page(driver, timeout=12)
+                if status == 'clicked':
+                    logger.info('Continue shopping popup dismissed on product page')
+
+                if status in ('clicked', 'sorry', 'error'):
+                    # If a sorry/error page appears (dog image), attempt recovery before scraping
+                    if not handle_sorry_page(driver, product_url=product_url, max_retries=3):
+                        logger.warning('Product page recovery failed — skipping this product')
+                        random_delay()
+                        continue
+                    status = 'ok' if wait_for_selector(driver, "#productTitle", timeout=12) else 'timeout'
+
+                if status != 'ok':
+                    random_delay()
+                    continue
+
+                expand_details(driver)
+                time.sleep(1.8)
+                html = driver.page_source
+                soup = BeautifulSoup(html, PARSER, parse_only=PRODUCT_STRAINER)
+                nodes = extract_all(soup)
+                if "#productTitle" not in nodes:
+                    # unexpected layout: fall back to parsing the whole page
+                    soup = BeautifulSoup(html, PARSER)
+                    nodes = extract_all(soup)
+
+                details = extract_product_details(nodes)
+                row = (
+                    pid,
+                    product_url,
+                    extract_title(nodes),
+                    extract_price(nodes),
+                    extract_rating(nodes),
+                    extract_brand(nodes),
+                    extract_color(nodes),
+                    orjson.dumps(details).decode(),
+                )
+
+                # Save about text
+                about = extract_about_text(nodes)
+                try:
+                    with open(os.path.join(TEXT_DIR, f"{pid}.txt"), "w", encoding="utf-8") as f:
+                        f.write(about)
+                except Exception:
+                    logger.exception(f"Failed to save about text for {pid}")
+
+                # Save image
+                img_url = extract_image_url(nodes)
+                if img_url:
+                    if len(pending_images) >= MAX_PENDING_IMAGES:
+                        pending_images.popleft().result()
+                    pending_images.append(_IMG_POOL.submit(save_image, pid, img_url))
+
+                # Append to CSV
+                if columns != CSV_FIELDS:
+                    # CSV started by an older run: one column per product-detail key
+                    values = {**dict(zip(CSV_FIELDS, row)), **details}
+                    row = [values.get(k, "") for k in columns]
+                writer.writerow(row)
+                ids_f.write(pid + "\n")
+
+                scraped_ids.add(pid)
+                total_scraped += 1
+                if total_scraped % CSV_FLUSH_EVERY == 0:
+                    csv_f.flush()
+                    ids_f.flush()
+                logger.info(f"Saved item {pid} — total saved for category: {total_scraped}")
                 random_delay()
-                continue
 
+            # Next page?
             try:
-                WebDriverWait(driver, 12).until(EC.presence_of_element_located((By.ID, "productTitle")))
+                next_btn = driver.find_element(By.CSS_SELECTOR, "a.s-pagination-next:not(.s-pagination-disabled)")
+                driver.execute_script("arguments[0].click();", next_btn)
+                time.sleep(3.5)
+                page += 1
             except:
-                random_delay()
-                continue
-
-            expand_details(driver)
-            time.sleep(1.8)
-            soup = BeautifulSoup(driver.page_source, "html.parser")
-
-            data = {
-                "id": pid,
-                "url": product_url,
-                "title": extract_title(soup),
-                "price": extract_price(soup),
-                "rating": extract_rating(soup),
-                "brand": extract_brand(soup),
-                "color": extract_color(soup),
-            }
-            data.update(extract_product_details(soup))
-
-            # Save about text
-            about = extract_about_text(soup)
-            try:
-                with open(os.path.join(TEXT_DIR, f"{pid}.txt"), "w", encoding="utf-8") as f:
-                    f.write(about)
-            except Exception:
-                logger.exception(f"Failed to save about text for {pid}")
-
-            # Save image
-            img_url = extract_image_url(soup)
-            if img_url:
-                ok = download_image(img_url, os.path.join(IMAGES_DIR, f"{pid}.jpg"))
-                if not ok:
-                    logger.warning(f"Failed to download image for {pid}: {img_url}")
-
-            # Append to CSV
-            file_exists = os.path.isfile(csv_file)
-            with open(csv_file, "a", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=data.keys())
-                if not file_exists:
-                    writer.writeheader()
-                writer.writerow(data)
-
-            scraped_ids.add(pid)
-            total_scraped += 1
-            logger.info(f"Saved item {pid} — total saved for category: {total_scraped}")
-            random_delay()
-
-        # Next page?
-        try:
-            next_btn = driver.find_element(By.CSS_SELECTOR, "a.s-pagination-next:not(.s-pagination-disabled)")
-            driver.execute_script("arguments[0].click();", next_btn)
-            time.sleep(3.5)
-            page += 1
-        except:
-            logger.info(f"No more pages for {category_name}")
-            break
+                logger.info(f"No more pages for {category_name}")
+                break
 
+    # Let the image downloads of this category drain before reporting
+    wait(pending_images)
     logger.info(f"Finished {category_name} → {total_scraped} items saved")
     try:
-        cat_elapsed = datetime.now() - cat_start
-        logger.info(f"Category {category_name} duration: {str(cat_elapsed)}")
+        cat_elapsed = (time.perf_counter_ns() - cat_start) / 1e9
+        logger.info(f"Category {category_name} duration: {cat_elapsed:.1f}s")
     except Exception:
         pass
 
@@ -440,10 +656,11 @@ def main():
         logger.exception("Unhandled exception in main loop")
     finally:
         try:
-            total_elapsed = datetime.now() - SCRIPT_START
-            logger.info(f"Script total duration: {str(total_elapsed)}")
+            total_elapsed = (time.perf_counter_ns() - SCRIPT_START) / 1e9
+            logger.info(f"Script total duration: {total_elapsed:.1f}s")
         except Exception:
             pass
+        _IMG_POOL.shutdown(wait=True)
         driver.quit()
 
 if __name__ == "__main__":
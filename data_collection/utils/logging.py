@@ -25,6 +25,11 @@ def load_config(path=None):
 
 
 def setup_logger(name: str = 'amazon_scraper', base_dir: str = None, config_path: str = None, caller_file: str = None):
+    logger = logging.getLogger(name)
+    # Avoid adding duplicate handlers (and rebuilding the log file path) if already configured
+    if logger.handlers:
+        return logger
+
     cfg = load_config(config_path)
     # Resolve log directory relative to base_dir if provided and log_dir is not absolute
     log_dir = cfg.get('log_dir', 'logs')
@@ -55,13 +60,8 @@ def setup_logger(name: str = 'amazon_scraper', base_dir: str = None, config_path
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     filename = os.path.join(log_dir, f"{prefix}_{timestamp}.log")
 
-    logger = logging.getLogger(name)
     logger.setLevel(level)
 
-    # Avoid adding duplicate handlers if already configured
-    if logger.handlers:
-        return logger
-
     fmt = f"{os.path.basename(filename)} | %(asctime)s | %(levelname)s | %(message)s"
     formatter = logging.Formatter(fmt, datefmt="%Y-%m-%d %H:%M:%S")
 
@@ -5,7 +5,8 @@ spark = SparkSession.builder \
     .master("local[*]") \
     .getOrCreate()
 
-df = spark.read.csv("/home/hamza/data/bronze/mens_jeans_bronze.csv", header=True, inferSchema=True)
+# Bronze CSVs quote fields RFC-4180 style (embedded quotes doubled, e.g. the product_details JSON)
+df = spark.read.option("escape", '"').csv("/home/hamza/data/bronze/mens_jeans_bronze.csv", header=True, inferSchema=True)
 df.show(10, truncate=False)
 
 # Save to silver — appears on your Windows machine instantly